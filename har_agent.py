@@ -13,23 +13,95 @@ Features:
 
 Usage:
     python har_agent.py analyze <har_file>       # Analyze with learning
+    python har_agent.py batch <har_file> [...]    # Analyze several HARs in one transaction
     python har_agent.py train                     # Interactive training
     python har_agent.py export <output.json>      # Export learned patterns
     python har_agent.py stats                     # Show knowledge base stats
+    python har_agent.py maintain                  # Vacuum + checkpoint knowledge base
 """
 
 import json
 import sqlite3
-import hashlib
 from pathlib import Path
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple, Set
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple, Set
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
+from contextlib import contextmanager
+from functools import lru_cache
 import re
-
-
-@dataclass
+import threading
+
+try:
+    from har_analyzer import HARAnalyzer  # базовый анализатор (лежит рядом с агентом)
+except ImportError:
+    HARAnalyzer = None
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # optional: pip install orjson
+except ImportError:
+    orjson = None
+
+
+# Placeholders для _extract_pattern (компилируются один раз)
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+_DIGIT_RE = re.compile(r'\d+')
+
+# Placeholder-токены, которые re трактует буквально, и настоящие regex-метасимволы
+_PLACEHOLDER_TOKENS = ('{uuid}', '{id}')
+_REGEX_METACHARS = frozenset('.^$*+?()[]{}\\|')
+
+def _json_dumps(value) -> str:
+    """JSON для TEXT-колонок SQLite (orjson, если установлен)"""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+def _json_loads(value: str):
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+def _json_default(value):
+    if isinstance(value, (Pattern, APIEndpointIntel)):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_json(path: str, data):
+    """Запись отчёта одним f.write(); dataclasses сериализуются напрямую"""
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        with open(path, 'wb') as f:
+            f.write(payload)
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=_json_default)
+
+
+# Dispatch tables для _detect_category / _infer_method (порядок = приоритет)
+_CATEGORY_RULES = (
+    (('/sse/',), 'SSE'),
+    (('/rest/',), 'REST'),
+    (('/realtime/',), 'Realtime'),
+    (('/threads/',), 'Threads'),
+    (('/auth/', '/login'), 'Auth'),
+)
+_METHOD_RULES = (
+    (('/create', '/add'), 'POST'),
+    (('/update', '/edit'), 'PUT'),
+    (('/delete', '/remove'), 'DELETE'),
+)
+
+
+@dataclass(slots=True)
 class Pattern:
     """Learned API pattern"""
     pattern: str
@@ -40,8 +112,20 @@ class Pattern:
     occurrence_count: int
     sources: List[str]  # Asset hashes где встречался
 
+    def to_dict(self) -> Dict:
+        """Быстрый аналог asdict() без reflection по fields"""
+        return {
+            'pattern': self.pattern,
+            'category': self.category,
+            'confidence': self.confidence,
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+            'occurrence_count': self.occurrence_count,
+            'sources': list(self.sources),
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class APIEndpointIntel:
     """Enriched API endpoint с intelligence"""
     path: str
@@ -55,14 +139,176 @@ class APIEndpointIntel:
     deprecation_risk: float  # Риск deprecation
     related_endpoints: List[str]  # Связанные endpoints
 
+    def to_dict(self) -> Dict:
+        """Быстрый аналог asdict() без reflection по fields"""
+        return {
+            'path': self.path,
+            'method': self.method,
+            'category': self.category,
+            'confidence': self.confidence,
+            'stability_score': self.stability_score,
+            'first_discovered': self.first_discovered,
+            'last_seen': self.last_seen,
+            'version_history': list(self.version_history),
+            'deprecation_risk': self.deprecation_risk,
+            'related_endpoints': list(self.related_endpoints),
+        }
+
+
+def _pattern_factory(cursor: sqlite3.Cursor, row: Tuple) -> Pattern:
+    """row_factory: строка patterns -> Pattern прямо во время fetch"""
+    return Pattern(
+        pattern=row[0],
+        category=row[1],
+        confidence=row[2],
+        first_seen=row[3],
+        last_seen=row[4],
+        occurrence_count=row[5],
+        sources=_json_loads(row[6])
+    )
+
+
+def _endpoint_factory(cursor: sqlite3.Cursor, row: Tuple) -> APIEndpointIntel:
+    """row_factory: строка endpoints -> APIEndpointIntel прямо во время fetch"""
+    return APIEndpointIntel(
+        path=row[0],
+        method=row[1],
+        category=row[2],
+        confidence=row[3],
+        stability_score=row[4],
+        first_discovered=row[5],
+        last_seen=row[6],
+        version_history=_json_loads(row[7]),
+        deprecation_risk=row[8],
+        related_endpoints=_json_loads(row[9])
+    )
+
+
+class PatternMatcher:
+    """Multi-pattern matcher для learned patterns
+
+    Большинство паттернов — literal paths (с {id}/{uuid} placeholders), поэтому
+    они ищутся одним проходом Aho-Corasick (или substring-проверками без
+    pyahocorasick). Настоящие regex паттерны проверяются отдельным списком.
+    Результат совпадает с линейным scan: первый совпавший паттерн в порядке
+    confidence DESC, occurrence_count DESC.
+    """
+
+    def __init__(self, learned_patterns: List[Pattern]):
+        self.patterns: List[Pattern] = []
+        self._literals: List[Tuple[int, str]] = []
+        self._regexes: List[Tuple[int, str, re.Pattern]] = []
+        self._automaton = None
+
+        for pattern in learned_patterns:
+            idx = len(self.patterns)
+            if self._is_literal(pattern.pattern):
+                self._literals.append((idx, pattern.pattern))
+            else:
+                try:
+                    self._regexes.append((idx, self._required_literal(pattern.pattern),
+                                          re.compile(pattern.pattern)))
+                except re.error:
+                    # Path с regex-метасимволами, который не является валидным regex
+                    continue
+            self.patterns.append(pattern)
+
+        if ahocorasick is not None and self._literals:
+            automaton = ahocorasick.Automaton()
+            for idx, literal in self._literals:
+                # Дубликаты literal: оставляем паттерн с наивысшим приоритетом
+                if literal not in automaton:
+                    automaton.add_word(literal, idx)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    @staticmethod
+    def _is_literal(pattern: str) -> bool:
+        for token in _PLACEHOLDER_TOKENS:
+            pattern = pattern.replace(token, '')
+        return not _REGEX_METACHARS.intersection(pattern)
+
+    @staticmethod
+    def _required_literal(pattern: str) -> str:
+        """Literal prefix, без которого regex не может совпасть (для pruning)"""
+        if '|' in pattern:
+            return ''  # Alternation: общей обязательной части может не быть
+
+        end = 0
+        while end < len(pattern) and pattern[end] not in _REGEX_METACHARS:
+            end += 1
+
+        # Символ перед квантификатором необязателен (например 'ab?')
+        if end < len(pattern) and pattern[end] in '*?{':
+            end -= 1
+        return pattern[:max(end, 0)]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def best_match(self, path: str) -> Optional[Pattern]:
+        """Паттерн с наивысшим приоритетом, совпадающий с path"""
+        best = len(self.patterns)
+
+        if self._automaton is not None:
+            for _, idx in self._automaton.iter(path):
+                if idx < best:
+                    best = idx
+        else:
+            for idx, literal in self._literals:
+                if idx >= best:
+                    break
+                if literal in path:
+                    best = idx
+                    break
+
+        for idx, literal, regex in self._regexes:
+            if idx >= best:
+                break
+            # Дешёвая substring-проверка отсекает большинство regex до search
+            if literal in path and regex.search(path):
+                best = idx
+                break
+
+        return self.patterns[best] if best < len(self.patterns) else None
+
 
 class KnowledgeBase:
-    """Persistent knowledge base для агента"""
+    """Persistent knowledge base для агента
+
+    Соединение работает в autocommit режиме (isolation_level=None): все записи
+    идут через write_transaction() с явным BEGIN IMMEDIATE / COMMIT под
+    self._lock — single-writer invariant. Одно соединение разделяется между
+    потоками (check_same_thread=False), поэтому чтения тоже берут self._lock:
+    WAL даёт параллельность только между разными соединениями, а на общем
+    читатель без lock увидел бы незакоммиченный batch другого потока.
+    """
+
+    # Размер буфера single-row upserts до flush через executemany
+    FLUSH_THRESHOLD = 500
 
     def __init__(self, db_path: str = "har_agent_knowledge.db"):
         self.db_path = Path(db_path)
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                    isolation_level=None, cached_statements=256)
+        self._lock = threading.RLock()  # RLock: batch() держит его вокруг вложенных записей
+        self._configure_connection()
         self._init_schema()
+        self._write_cursor = self.conn.cursor()
+        self._pending_patterns: List[Tuple] = []
+        self._pending_endpoints: List[Tuple] = []
+        self._in_batch = False
+        self._stats_cache: Optional[Dict] = None  # Сбрасывается при каждой записи
+
+    def _configure_connection(self):
+        """PRAGMA tuning: WAL + NORMAL sync вместо fsync rollback journal на каждый commit"""
+        if str(self.db_path) != ':memory:':
+            # WAL не поддерживается для in-memory БД
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
+        self.conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
 
     def _init_schema(self):
         """Создание схемы БД"""
@@ -124,47 +370,59 @@ class KnowledgeBase:
             )
         """)
 
-        self.conn.commit()
+        # Indexes для get_learned_patterns, detect_deprecations и train_interactive
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_patterns_conf
+            ON patterns(confidence DESC, occurrence_count DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_endpoints_lastseen
+            ON endpoints(last_seen, deprecation_risk DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_endpoints_conf
+            ON endpoints(confidence)
+        """)
 
-    def learn_pattern(self, pattern: Pattern):
-        """Обучение на новом паттерне"""
-        cursor = self.conn.cursor()
+        self.conn.commit()
 
-        cursor.execute("""
-            INSERT INTO patterns (pattern, category, confidence, first_seen, last_seen, occurrence_count, sources)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(pattern) DO UPDATE SET
-                last_seen = excluded.last_seen,
-                occurrence_count = occurrence_count + 1,
-                confidence = MIN(1.0, confidence + 0.05),  -- Increase confidence
-                sources = excluded.sources
-        """, (
+    _PATTERN_UPSERT_SQL = """
+        INSERT INTO patterns (pattern, category, confidence, first_seen, last_seen, occurrence_count, sources)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(pattern) DO UPDATE SET
+            last_seen = excluded.last_seen,
+            occurrence_count = occurrence_count + 1,
+            confidence = MIN(1.0, confidence + 0.05),  -- Increase confidence
+            sources = excluded.sources
+    """
+
+    _ENDPOINT_UPSERT_SQL = """
+        INSERT INTO endpoints (path, method, category, confidence, stability_score, 
+                              first_discovered, last_seen, version_history, 
+                              deprecation_risk, related_endpoints)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            last_seen = excluded.last_seen,
+            confidence = MIN(1.0, confidence + 0.03),
+            stability_score = (stability_score + excluded.stability_score) / 2,
+            version_history = excluded.version_history
+    """
+
+    @staticmethod
+    def _pattern_params(pattern: Pattern) -> Tuple:
+        return (
             pattern.pattern,
             pattern.category,
             pattern.confidence,
             pattern.first_seen,
             pattern.last_seen,
             pattern.occurrence_count,
-            json.dumps(pattern.sources)
-        ))
-
-        self.conn.commit()
-
-    def learn_endpoint(self, endpoint: APIEndpointIntel):
-        """Обучение на endpoint"""
-        cursor = self.conn.cursor()
+            _json_dumps(pattern.sources)
+        )
 
-        cursor.execute("""
-            INSERT INTO endpoints (path, method, category, confidence, stability_score, 
-                                  first_discovered, last_seen, version_history, 
-                                  deprecation_risk, related_endpoints)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-                last_seen = excluded.last_seen,
-                confidence = MIN(1.0, confidence + 0.03),
-                stability_score = (stability_score + excluded.stability_score) / 2,
-                version_history = excluded.version_history
-        """, (
+    @staticmethod
+    def _endpoint_params(endpoint: APIEndpointIntel) -> Tuple:
+        return (
             endpoint.path,
             endpoint.method,
             endpoint.category,
@@ -172,79 +430,176 @@ class KnowledgeBase:
             endpoint.stability_score,
             endpoint.first_discovered,
             endpoint.last_seen,
-            json.dumps(endpoint.version_history),
+            _json_dumps(endpoint.version_history),
             endpoint.deprecation_risk,
-            json.dumps(endpoint.related_endpoints)
-        ))
+            _json_dumps(endpoint.related_endpoints)
+        )
 
-        self.conn.commit()
+    @contextmanager
+    def write_transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT на общем write cursor (rollback при ошибке)
+
+        Внутри batch() транзакция уже открыта — вложенные вызовы просто
+        переиспользуют её, commit происходит один раз в конце batch.
+        """
+        with self._lock:
+            self._stats_cache = None
+            if self._in_batch:
+                yield self._write_cursor
+                return
+
+            self._write_cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._write_cursor
+            except BaseException:
+                self._write_cursor.execute("ROLLBACK")
+                raise
+            else:
+                self._write_cursor.execute("COMMIT")
+            finally:
+                # get_stats() внутри транзакции кэширует незакоммиченные counts
+                self._stats_cache = None
+
+    def learn_pattern(self, pattern: Pattern):
+        """Обучение на новом паттерне (буферизуется до flush)"""
+        with self._lock:
+            self._pending_patterns.append(self._pattern_params(pattern))
+            if len(self._pending_patterns) >= self.FLUSH_THRESHOLD:
+                self.flush()
+
+    def learn_endpoint(self, endpoint: APIEndpointIntel):
+        """Обучение на endpoint (буферизуется до flush)"""
+        with self._lock:
+            self._pending_endpoints.append(self._endpoint_params(endpoint))
+            if len(self._pending_endpoints) >= self.FLUSH_THRESHOLD:
+                self.flush()
+
+    def learn_patterns_bulk(self, patterns: List[Pattern]):
+        """Batch-обучение: все паттерны в одной транзакции"""
+        with self._lock:
+            self._pending_patterns.extend(self._pattern_params(p) for p in patterns)
+            self.flush()
+
+    def learn_endpoints_bulk(self, endpoints: List[APIEndpointIntel]):
+        """Batch-обучение: все endpoints в одной транзакции"""
+        with self._lock:
+            self._pending_endpoints.extend(self._endpoint_params(e) for e in endpoints)
+            self.flush()
+
+    def learn_bulk(self, endpoints: List[APIEndpointIntel], patterns: List[Pattern]):
+        """Batch-обучение: endpoints и patterns одной транзакцией (один flush)"""
+        with self._lock:
+            self._pending_endpoints.extend(self._endpoint_params(e) for e in endpoints)
+            self._pending_patterns.extend(self._pattern_params(p) for p in patterns)
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Одна write-транзакция на несколько анализов (batch/autonomous mode)
+
+        Незакоммиченные записи видны этому же соединению, поэтому каждый
+        следующий анализ в batch использует знания предыдущих. Вложенный
+        batch() переиспользует внешнюю транзакцию.
+        """
+        with self._lock:
+            if self._in_batch:
+                yield self
+                return
+
+        self.flush()
+        with self.write_transaction():
+            self._in_batch = True
+            try:
+                yield self
+                self.flush()
+            except BaseException:
+                # ROLLBACK: upserts, поставленные в очередь внутри batch, тоже отбрасываются
+                self._pending_endpoints = []
+                self._pending_patterns = []
+                raise
+            finally:
+                self._in_batch = False
+
+    def flush(self):
+        """Запись буферизованных upserts одной транзакцией"""
+        with self._lock:
+            if not self._pending_patterns and not self._pending_endpoints:
+                return
+
+            # Буферы забираются до execute: битая строка падает один раз, а не в каждом flush
+            endpoints, self._pending_endpoints = self._pending_endpoints, []
+            patterns, self._pending_patterns = self._pending_patterns, []
+            with self.write_transaction() as cursor:
+                if endpoints:
+                    cursor.executemany(self._ENDPOINT_UPSERT_SQL, endpoints)
+                if patterns:
+                    cursor.executemany(self._PATTERN_UPSERT_SQL, patterns)
+
+    def iter_learned_patterns(self, min_confidence: float = 0.7) -> Iterator[Pattern]:
+        """Изученные паттерны без материализации всего результата
+
+        Lock держится, пока генератор не исчерпан или не закрыт.
+        """
+        with self._lock:
+            self.flush()
+            cursor = self.conn.cursor()
+            cursor.row_factory = _pattern_factory
+            cursor.execute("""
+                SELECT pattern, category, confidence, first_seen, last_seen, 
+                       occurrence_count, sources
+                FROM patterns
+                WHERE confidence >= ?
+                ORDER BY confidence DESC, occurrence_count DESC
+            """, (min_confidence,))
+
+            yield from cursor
 
     def get_learned_patterns(self, min_confidence: float = 0.7) -> List[Pattern]:
         """Получить изученные паттерны"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT pattern, category, confidence, first_seen, last_seen, 
-                   occurrence_count, sources
-            FROM patterns
-            WHERE confidence >= ?
-            ORDER BY confidence DESC, occurrence_count DESC
-        """, (min_confidence,))
-
-        patterns = []
-        for row in cursor.fetchall():
-            patterns.append(Pattern(
-                pattern=row[0],
-                category=row[1],
-                confidence=row[2],
-                first_seen=row[3],
-                last_seen=row[4],
-                occurrence_count=row[5],
-                sources=json.loads(row[6])
-            ))
-
-        return patterns
+        return list(self.iter_learned_patterns(min_confidence))
 
     def detect_deprecations(self, days_threshold: int = 30) -> List[APIEndpointIntel]:
         """Детект возможных deprecated endpoints"""
-        cursor = self.conn.cursor()
         threshold_date = (datetime.now() - timedelta(days=days_threshold)).isoformat()
 
-        cursor.execute("""
-            SELECT path, method, category, confidence, stability_score,
-                   first_discovered, last_seen, version_history,
-                   deprecation_risk, related_endpoints
-            FROM endpoints
-            WHERE last_seen < ?
-            ORDER BY deprecation_risk DESC
-        """, (threshold_date,))
-
-        deprecated = []
-        for row in cursor.fetchall():
-            intel = APIEndpointIntel(
-                path=row[0],
-                method=row[1],
-                category=row[2],
-                confidence=row[3],
-                stability_score=row[4],
-                first_discovered=row[5],
-                last_seen=row[6],
-                version_history=json.loads(row[7]),
-                deprecation_risk=row[8],
-                related_endpoints=json.loads(row[9])
-            )
-            deprecated.append(intel)
-
-        return deprecated
+        with self._lock:
+            self.flush()
+            cursor = self.conn.cursor()
+            cursor.row_factory = _endpoint_factory
+            cursor.execute("""
+                SELECT path, method, category, confidence, stability_score,
+                       first_discovered, last_seen, version_history,
+                       deprecation_risk, related_endpoints
+                FROM endpoints
+                WHERE last_seen < ?
+                ORDER BY deprecation_risk DESC
+            """, (threshold_date,))
+
+            return cursor.fetchall()
+
+    def get_uncertain_endpoints(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Случайные low-confidence endpoints для interactive training"""
+        with self._lock:
+            self.flush()
+            return self.conn.execute("""
+                SELECT path, confidence FROM endpoints 
+                WHERE confidence < 0.7 
+                ORDER BY RANDOM() 
+                LIMIT ?
+            """, (limit,)).fetchall()
 
     def add_feedback(self, endpoint_path: str, feedback_type: str, comment: str = ""):
         """Human-in-the-loop feedback"""
-        cursor = self.conn.cursor()
+        self.flush()
+
+        with self.write_transaction() as cursor:
+            # Find endpoint ID
+            cursor.execute("SELECT id FROM endpoints WHERE path = ?", (endpoint_path,))
+            result = cursor.fetchone()
 
-        # Find endpoint ID
-        cursor.execute("SELECT id FROM endpoints WHERE path = ?", (endpoint_path,))
-        result = cursor.fetchone()
+            if not result:
+                return
 
-        if result:
             endpoint_id = result[0]
             cursor.execute("""
                 INSERT INTO feedback (endpoint_id, feedback_type, comment, created_at)
@@ -265,36 +620,105 @@ class KnowledgeBase:
                     WHERE id = ?
                 """, (endpoint_id,))
 
-            self.conn.commit()
-
     def get_stats(self) -> Dict:
-        """Статистика knowledge base"""
-        cursor = self.conn.cursor()
+        """Статистика knowledge base (кэшируется до следующей записи)"""
+        with self._lock:
+            self.flush()
+            if self._stats_cache is not None:
+                return dict(self._stats_cache)
 
-        stats = {}
+            cursor = self.conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM patterns")
-        stats['total_patterns'] = cursor.fetchone()[0]
+            stats = {}
 
-        cursor.execute("SELECT COUNT(*) FROM patterns WHERE confidence >= 0.8")
-        stats['high_confidence_patterns'] = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM patterns")
+            stats['total_patterns'] = cursor.fetchone()[0]
 
-        cursor.execute("SELECT COUNT(*) FROM endpoints")
-        stats['total_endpoints'] = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM patterns WHERE confidence >= 0.8")
+            stats['high_confidence_patterns'] = cursor.fetchone()[0]
 
-        cursor.execute("SELECT COUNT(*) FROM endpoints WHERE confidence >= 0.8")
-        stats['high_confidence_endpoints'] = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM endpoints")
+            stats['total_endpoints'] = cursor.fetchone()[0]
 
-        cursor.execute("SELECT COUNT(*) FROM analysis_history")
-        stats['total_analyses'] = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM endpoints WHERE confidence >= 0.8")
+            stats['high_confidence_endpoints'] = cursor.fetchone()[0]
 
-        cursor.execute("SELECT AVG(quality_score) FROM analysis_history")
-        stats['avg_quality_score'] = cursor.fetchone()[0] or 0.0
+            cursor.execute("SELECT COUNT(*) FROM analysis_history")
+            stats['total_analyses'] = cursor.fetchone()[0]
 
-        return stats
+            cursor.execute("SELECT AVG(quality_score) FROM analysis_history")
+            stats['avg_quality_score'] = cursor.fetchone()[0] or 0.0
+
+            self._stats_cache = stats
+            return dict(stats)
+
+    def vacuum(self):
+        """Maintenance: дефрагментация БД и truncate WAL файла"""
+        with self._lock:
+            self.flush()
+            self.conn.execute("VACUUM")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
     def close(self):
-        self.conn.close()
+        with self._lock:
+            try:
+                self.flush()
+                self.conn.execute("PRAGMA optimize")  # ANALYZE только для изменившихся таблиц
+            finally:
+                self.conn.close()
+
+
+@lru_cache(maxsize=4096)
+def _detect_category(path: str) -> str:
+    """Category detection (memoized: одни и те же paths повторяются между HAR)"""
+    for markers, category in _CATEGORY_RULES:
+        for marker in markers:
+            if marker in path:
+                return category
+    return 'Other'
+
+
+@lru_cache(maxsize=4096)
+def _infer_method(path: str) -> str:
+    """HTTP method inference (memoized)"""
+    for markers, method in _METHOD_RULES:
+        for marker in markers:
+            if marker in path:
+                return method
+    return 'GET'
+
+
+def _enrich_endpoint(path: str, sources: List[dict],
+                     matcher: PatternMatcher, now: str) -> APIEndpointIntel:
+    """Обогащение endpoint intelligence"""
+    # Category detection
+    category = _detect_category(path)
+
+    # Confidence scoring (на основе learned patterns)
+    confidence = 0.5  # default
+    pattern = matcher.best_match(path)
+    if pattern is not None:
+        confidence = max(confidence, pattern.confidence)
+
+    # Stability score (как часто встречается в разных sources)
+    unique_hashes = {s['hash'] for s in sources}
+    stability_score = min(1.0, len(unique_hashes) / 10.0)
+
+    # Deprecation risk (пока простая эвристика)
+    deprecation_risk = 0.1 if confidence > 0.8 else 0.3
+
+    return APIEndpointIntel(
+        path=path,
+        method=_infer_method(path),
+        category=category,
+        confidence=confidence,
+        stability_score=stability_score,
+        first_discovered=now,
+        last_seen=now,
+        version_history=[],
+        deprecation_risk=deprecation_risk,
+        related_endpoints=[]
+    )
 
 
 class HARAgent:
@@ -310,40 +734,47 @@ class HARAgent:
             'quality_metrics': {}
         }
 
-    def analyze_har(self, har_path: str, learn: bool = True) -> Dict:
+    def analyze_har(self, har_path: str, learn: bool = True,
+                    har_data: Optional[dict] = None) -> Dict:
         """
         Анализ HAR файла с применением накопленных знаний
 
         Args:
             har_path: путь к HAR файлу
             learn: обновлять knowledge base после анализа
+            har_data: уже распарсенный HAR (пропускает повторный load_har)
         """
+        if HARAnalyzer is None:
+            raise RuntimeError("har_analyzer.py not found: place it next to har_agent.py")
+
         print(f"\n🤖 HAR Agent starting analysis...")
         print(f"📁 HAR file: {har_path}")
 
         self.current_session['har_file'] = har_path
 
         # 1. Базовый анализ (используем существующий HARAnalyzer)
-        from har_analyzer import HARAnalyzer
         analyzer = HARAnalyzer(har_path)
-        har_data = analyzer.load_har()
+        if har_data is None:
+            har_data = analyzer.load_har()
         analyzer.extract_js_assets(har_data)
         analyzer.extract_api_endpoints()
 
         # 2. Применяем знания
         print(f"\n🧠 Applying learned patterns...")
         learned_patterns = self.kb.get_learned_patterns(min_confidence=0.7)
-        print(f"   Using {len(learned_patterns)} high-confidence patterns")
+        matcher = PatternMatcher(learned_patterns)
+        print(f"   Using {len(matcher)} high-confidence patterns")
 
         # 3. Enrichment: добавляем intelligence к найденным endpoints
-        enriched_endpoints = []
         new_discoveries = []
+        now = datetime.now().isoformat()  # Один логический "now" на весь анализ
 
-        for endpoint_path, sources in analyzer.api_endpoints.items():
-            # Проверяем, знаем ли мы этот endpoint
-            intel = self._enrich_endpoint(endpoint_path, sources, learned_patterns)
-            enriched_endpoints.append(intel)
+        enriched_endpoints = [
+            _enrich_endpoint(endpoint_path, sources, matcher, now)
+            for endpoint_path, sources in analyzer.api_endpoints.items()
+        ]
 
+        for intel in enriched_endpoints:
             # Новые discovery?
             if intel.confidence < 0.5:  # Низкая уверенность = новый
                 new_discoveries.append(intel)
@@ -381,10 +812,10 @@ class HARAgent:
                 'deprecated_risk': len(deprecated),
                 'quality_score': quality_score
             },
-            'enriched_endpoints': [asdict(e) for e in enriched_endpoints],
-            'new_discoveries': [asdict(e) for e in new_discoveries],
+            'enriched_endpoints': [e.to_dict() for e in enriched_endpoints],
+            'new_discoveries': [e.to_dict() for e in new_discoveries],
             'anomalies': anomalies,
-            'deprecated': [asdict(d) for d in deprecated],
+            'deprecated': [d.to_dict() for d in deprecated],
             'knowledge_stats': self.kb.get_stats()
         }
 
@@ -392,65 +823,10 @@ class HARAgent:
 
         return report
 
-    def _enrich_endpoint(self, path: str, sources: List[dict], 
-                         learned_patterns: List[Pattern]) -> APIEndpointIntel:
-        """Обогащение endpoint intelligence"""
-        now = datetime.now().isoformat()
-
-        # Category detection
-        category = self._detect_category(path)
-
-        # Confidence scoring (на основе learned patterns)
-        confidence = 0.5  # default
-        for pattern in learned_patterns:
-            if re.search(pattern.pattern, path):
-                confidence = max(confidence, pattern.confidence)
-                break
-
-        # Stability score (как часто встречается в разных sources)
-        stability_score = min(1.0, len(set(s['hash'] for s in sources)) / 10.0)
-
-        # Deprecation risk (пока простая эвристика)
-        deprecation_risk = 0.1 if confidence > 0.8 else 0.3
-
-        return APIEndpointIntel(
-            path=path,
-            method=self._infer_method(path),
-            category=category,
-            confidence=confidence,
-            stability_score=stability_score,
-            first_discovered=now,
-            last_seen=now,
-            version_history=[],
-            deprecation_risk=deprecation_risk,
-            related_endpoints=[]
-        )
-
-    def _detect_category(self, path: str) -> str:
-        """Category detection"""
-        if '/sse/' in path:
-            return 'SSE'
-        elif '/rest/' in path:
-            return 'REST'
-        elif '/realtime/' in path:
-            return 'Realtime'
-        elif '/threads/' in path:
-            return 'Threads'
-        elif '/auth/' in path or '/login' in path:
-            return 'Auth'
-        else:
-            return 'Other'
-
-    def _infer_method(self, path: str) -> str:
-        """HTTP method inference"""
-        if '/create' in path or '/add' in path:
-            return 'POST'
-        elif '/update' in path or '/edit' in path:
-            return 'PUT'
-        elif '/delete' in path or '/remove' in path:
-            return 'DELETE'
-        else:
-            return 'GET'
+    def analyze_har_batch(self, har_paths: List[str], learn: bool = True) -> List[Dict]:
+        """Batch анализ нескольких HAR файлов в одной write-транзакции"""
+        with self.kb.batch():
+            return [self.analyze_har(path, learn=learn) for path in har_paths]
 
     def _detect_anomalies(self, endpoints: List[APIEndpointIntel]) -> List[Dict]:
         """Anomaly detection"""
@@ -458,17 +834,19 @@ class HARAgent:
 
         # Странные паттерны
         for ep in endpoints:
-            if len(ep.path) > 200:  # Слишком длинный
+            path = ep.path
+            if len(path) > 200:  # Слишком длинный
                 anomalies.append({
                     'type': 'unusual_length',
-                    'endpoint': ep.path,
+                    'endpoint': path,
                     'severity': 'medium'
                 })
 
-            if '${' in ep.path or '{{' in ep.path:  # Template не resolved
+            # Template не resolved; single-char '{' (memchr) отсекает почти все paths
+            if '{' in path and ('${' in path or '{{' in path):
                 anomalies.append({
                     'type': 'unresolved_template',
-                    'endpoint': ep.path,
+                    'endpoint': path,
                     'severity': 'low'
                 })
 
@@ -476,11 +854,8 @@ class HARAgent:
 
     def _learn_from_analysis(self, endpoints: List[APIEndpointIntel], js_assets: List):
         """Обучение на результатах анализа"""
-        for ep in endpoints:
-            self.kb.learn_endpoint(ep)
-
-            # Learn pattern
-            pattern = Pattern(
+        patterns = [
+            Pattern(
                 pattern=self._extract_pattern(ep.path),
                 category=ep.category,
                 confidence=ep.confidence,
@@ -489,14 +864,19 @@ class HARAgent:
                 occurrence_count=1,
                 sources=[]
             )
-            self.kb.learn_pattern(pattern)
+            for ep in endpoints
+        ]
+
+        # Одна транзакция на endpoints и patterns вместо 2N commit'ов
+        self.kb.learn_bulk(endpoints, patterns)
 
     def _extract_pattern(self, path: str) -> str:
         """Извлечение regex pattern из конкретного path"""
         # Заменяем UUID, числа на placeholders
-        pattern = re.sub(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', 
-                        '{uuid}', path)
-        pattern = re.sub(r'\d+', '{id}', pattern)
+        pattern = path
+        if '-' in pattern:  # UUID без дефисов не бывает — пропускаем лишний проход
+            pattern = _UUID_RE.sub('{uuid}', pattern)
+        pattern = _DIGIT_RE.sub('{id}', pattern)
         return pattern
 
     def _assess_quality(self, endpoints: List[APIEndpointIntel], 
@@ -516,14 +896,13 @@ class HARAgent:
     def _save_analysis_history(self, har_file: str, js_count: int, 
                                endpoints_count: int, new_patterns: int, quality: float):
         """Save to history"""
-        cursor = self.kb.conn.cursor()
-        cursor.execute("""
-            INSERT INTO analysis_history 
-            (har_file, analyzed_at, js_assets_count, endpoints_found, new_patterns, quality_score)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (har_file, datetime.now().isoformat(), js_count, endpoints_count, 
-              new_patterns, quality))
-        self.kb.conn.commit()
+        with self.kb.write_transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO analysis_history 
+                (har_file, analyzed_at, js_assets_count, endpoints_found, new_patterns, quality_score)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (har_file, datetime.now().isoformat(), js_count, endpoints_count, 
+                  new_patterns, quality))
 
     def _print_report(self, report: Dict):
         """Pretty print report"""
@@ -562,15 +941,7 @@ class HARAgent:
         print(f"\n🎓 Interactive Training Mode")
         print(f"="*80)
 
-        cursor = self.kb.conn.cursor()
-        cursor.execute("""
-            SELECT path, confidence FROM endpoints 
-            WHERE confidence < 0.7 
-            ORDER BY RANDOM() 
-            LIMIT 10
-        """)
-
-        for path, confidence in cursor.fetchall():
+        for path, confidence in self.kb.get_uncertain_endpoints(limit=10):
             print(f"\n📍 Endpoint: {path}")
             print(f"   Current confidence: {confidence:.2f}")
 
@@ -598,12 +969,11 @@ class HARAgent:
         export_data = {
             'exported_at': datetime.now().isoformat(),
             'total_patterns': len(patterns),
-            'patterns': [asdict(p) for p in patterns],
+            'patterns': patterns,
             'stats': self.kb.get_stats()
         }
 
-        with open(output_path, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        _write_json(output_path, export_data)
 
         print(f"✓ Exported {len(patterns)} patterns to {output_path}")
 
@@ -618,9 +988,11 @@ def main():
         print("""
 Usage:
     python har_agent.py analyze <har_file>       # Analyze with learning
+    python har_agent.py batch <har_file> [...]    # Analyze several HARs in one transaction
     python har_agent.py train                     # Interactive training
     python har_agent.py export <output.json>      # Export learned patterns
     python har_agent.py stats                     # Show knowledge base stats
+    python har_agent.py maintain                  # Vacuum + checkpoint knowledge base
         """)
         sys.exit(1)
 
@@ -637,10 +1009,20 @@ Usage:
 
             # Save report
             report_path = f"har_agent_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(report_path, 'w') as f:
-                json.dump(report, f, indent=2)
+            _write_json(report_path, report)
             print(f"\n💾 Report saved: {report_path}")
 
+        elif command == 'batch':
+            if len(sys.argv) < 3:
+                print("Error: at least one HAR file path required")
+                sys.exit(1)
+
+            reports = agent.analyze_har_batch(sys.argv[2:], learn=True)
+
+            report_path = f"har_agent_batch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            _write_json(report_path, reports)
+            print(f"\n💾 Batch report saved: {report_path}")
+
         elif command == 'train':
             agent.train_interactive()
 
@@ -654,6 +1036,10 @@ Usage:
             for key, value in stats.items():
                 print(f"  {key}: {value}")
 
+        elif command == 'maintain':
+            agent.kb.vacuum()
+            print("✓ Knowledge base vacuumed and WAL checkpointed")
+
         else:
             print(f"Unknown command: {command}")
 
@@ -3,6 +3,7 @@
 __version__ = "0.1.0"
 
 from .config import BaseSettings
+from .json_utils import dump_json, iter_json_items, load_json
 from .logger import get_logger
 
-__all__ = ["BaseSettings", "get_logger"]
+__all__ = ["BaseSettings", "dump_json", "get_logger", "iter_json_items", "load_json"]
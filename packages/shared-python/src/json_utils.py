@@ -0,0 +1,85 @@
+"""JSON loading and serialization helpers.
+
+Uses orjson for parsing/serialization and ijson for streaming large
+documents when they are installed, falling back to the stdlib json module.
+"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import ijson  # type: ignore[import-untyped, unused-ignore]
+except ImportError:  # pragma: no cover - optional accelerator
+    ijson = None
+
+
+def load_json(path: Path) -> Any:
+    """Parse a JSON file.
+
+    Args:
+        path: Path to JSON file
+
+    Returns:
+        Parsed document
+    """
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def dump_json(data: Any, path: Path) -> None:
+    """Write data to a JSON file with 2-space indentation.
+
+    Args:
+        data: JSON-serializable data
+        path: Output file path
+    """
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def iter_json_items(path: Path, prefix: str) -> Iterator[Any]:
+    """Yield the elements of a nested JSON array one at a time.
+
+    With ijson installed only one element is held in memory at a time;
+    otherwise the whole document is parsed first.
+
+    Args:
+        path: Path to JSON file
+        prefix: ijson-style prefix of the array items, e.g. "log.entries.item"
+
+    Yields:
+        Array elements
+    """
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, prefix, use_float=True)
+        return
+
+    *keys, item = prefix.split(".")
+    if item != "item":
+        raise ValueError(f"Prefix must point at array items: {prefix}")
+
+    node = load_json(path)
+    for key in keys:
+        if not isinstance(node, dict) or key not in node:
+            return
+        node = node[key]
+
+    if isinstance(node, list):
+        yield from node
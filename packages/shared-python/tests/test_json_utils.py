@@ -0,0 +1,79 @@
+"""Tests for shared JSON helpers."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add shared-python sources to path
+src_dir = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+import json_utils  # type: ignore[import-not-found, unused-ignore]  # noqa: E402
+
+HAR = {
+    "log": {
+        "version": "1.2",
+        "entries": [
+            {"request": {"method": "GET", "url": "https://example.com/a"}},
+            {"request": {"method": "POST", "url": "https://example.com/b"}},
+        ],
+    }
+}
+
+
+@pytest.fixture(params=["accelerated", "stdlib"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run a test with orjson/ijson when installed and with the stdlib fallback."""
+    if request.param == "accelerated":
+        if json_utils.orjson is None or json_utils.ijson is None:
+            pytest.skip("orjson/ijson not installed")
+    else:
+        monkeypatch.setattr(json_utils, "orjson", None)
+        monkeypatch.setattr(json_utils, "ijson", None)
+    return str(request.param)
+
+
+def test_load_json(backend: str, tmp_path: Path) -> None:
+    """Test loading a JSON document."""
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(HAR))
+
+    assert json_utils.load_json(path) == HAR
+
+
+def test_dump_json_round_trip(backend: str, tmp_path: Path) -> None:
+    """Test dumping with 2-space indentation."""
+    path = tmp_path / "out.json"
+    json_utils.dump_json(HAR, path)
+
+    assert json.loads(path.read_text()) == HAR
+    assert path.read_text().startswith('{\n  "log": {\n    "version"')
+
+
+def test_iter_json_items(backend: str, tmp_path: Path) -> None:
+    """Test iterating a nested array."""
+    path = tmp_path / "capture.har"
+    path.write_text(json.dumps(HAR))
+
+    items = list(json_utils.iter_json_items(path, "log.entries.item"))
+    assert items == HAR["log"]["entries"]
+
+
+def test_iter_json_items_missing_key(backend: str, tmp_path: Path) -> None:
+    """Test that a prefix pointing nowhere yields nothing."""
+    path = tmp_path / "capture.har"
+    path.write_text(json.dumps(HAR))
+
+    assert list(json_utils.iter_json_items(path, "log.pages.item")) == []
+
+
+def test_iter_json_items_bad_prefix(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the fallback rejects prefixes not ending in array items."""
+    monkeypatch.setattr(json_utils, "ijson", None)
+    path = tmp_path / "capture.har"
+    path.write_text(json.dumps(HAR))
+
+    with pytest.raises(ValueError, match="array items"):
+        list(json_utils.iter_json_items(path, "log.entries"))
@@ -0,0 +1,29 @@
+"""Tests for shared logging helpers."""
+
+import logging
+import sys
+from pathlib import Path
+
+# Add shared-python sources to path
+src_dir = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from logger import get_logger  # type: ignore[import-not-found, unused-ignore]  # noqa: E402
+
+
+def test_get_logger_reapplies_level() -> None:
+    """Test that asking for a level again applies it."""
+    get_logger("shared.test.level", logging.DEBUG)
+    get_logger("shared.test.level")
+    logger = get_logger("shared.test.level", logging.DEBUG)
+
+    assert logger.level == logging.DEBUG
+
+
+def test_get_logger_restores_handlers() -> None:
+    """Test that a logger whose handlers were removed gets one back."""
+    logger = get_logger("shared.test.handlers")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    assert get_logger("shared.test.handlers").handlers
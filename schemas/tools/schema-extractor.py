@@ -1,15 +1,14 @@
 """Schema extraction tool for Perplexity AI API."""
 
-import json
 import sys
 from pathlib import Path
-from typing import Any
 
 # Add packages to path (go up 3 levels to repo root, then into packages)
 sys.path.insert(
     0, str(Path(__file__).parent.parent.parent / "packages" / "shared-python" / "src")
 )
 
+from json_utils import dump_json, iter_json_items, load_json  # type: ignore[import-not-found, unused-ignore]
 from logger import get_logger  # type: ignore
 
 logger = get_logger(__name__)
@@ -24,8 +23,13 @@ def extract_schema(input_file: Path, output_file: Path) -> None:
     """
     logger.info(f"Extracting schema from {input_file}")
 
-    with open(input_file) as f:
-        _data: dict[str, Any] = json.load(f)
+    # Only parsed so malformed input fails early; nothing is extracted yet.
+    # HAR entries are streamed, so only one entry is held in memory at a time.
+    if input_file.suffix == ".har":
+        entry_count = sum(1 for _ in iter_json_items(input_file, "log.entries.item"))
+        logger.info(f"Read {entry_count} HAR entries")
+    else:
+        load_json(input_file)
 
     # Basic schema extraction logic
     # This is a placeholder - implement actual extraction based on your needs
@@ -35,8 +39,7 @@ def extract_schema(input_file: Path, output_file: Path) -> None:
         "models": {},
     }
 
-    with open(output_file, "w") as f:
-        json.dump(schema, f, indent=2)
+    dump_json(schema, output_file)
 
     logger.info(f"Schema extracted to {output_file}")
 
@@ -1,6 +1,5 @@
 """Schema validator for Perplexity AI API."""
 
-import json
 import sys
 from pathlib import Path
 from typing import Any
@@ -10,6 +9,7 @@ sys.path.insert(
     0, str(Path(__file__).parent.parent.parent / "packages" / "shared-python" / "src")
 )
 
+from json_utils import load_json  # type: ignore[import-not-found, unused-ignore]
 from logger import get_logger  # type: ignore
 
 logger = get_logger(__name__)
@@ -27,19 +27,19 @@ def validate_schema(schema_file: Path) -> bool:
     logger.info(f"Validating schema {schema_file}")
 
     try:
-        with open(schema_file) as f:
-            # Try to determine file type by extension
-            if schema_file.suffix in [".yaml", ".yml"]:
-                try:
-                    import yaml
+        # Try to determine file type by extension
+        if schema_file.suffix in [".yaml", ".yml"]:
+            try:
+                import yaml
 
+                with open(schema_file) as f:
                     schema: dict[str, Any] = yaml.safe_load(f)
-                except ImportError:
-                    logger.warning("PyYAML not installed, skipping YAML validation")
-                    logger.info("Install PyYAML to validate YAML schemas: pip install pyyaml")
-                    return True  # Skip validation if yaml not available
-            else:
-                schema = json.load(f)
+            except ImportError:
+                logger.warning("PyYAML not installed, skipping YAML validation")
+                logger.info("Install PyYAML to validate YAML schemas: pip install pyyaml")
+                return True  # Skip validation if yaml not available
+        else:
+            schema = load_json(schema_file)
 
         # Basic validation for JSON schemas
         if schema_file.suffix == ".json":
@@ -6,136 +6,372 @@ Updates spa-assets/metadata/asset-index.json with current asset information.
 Scans all subdirectories and catalogs files with metadata.
 
 Usage:
-    python scripts/update_asset_index.py [--verify]
+    python scripts/update_asset_index.py [--verify [--fast]]
+
+--fast trusts file modification times: if nothing under spa-assets/ is newer
+than asset-index.json the full comparison is skipped. Use it for local
+hooks, not on fresh checkouts where every file gets the same mtime.
 """
 
 import json
+import operator
+import os
+from collections import Counter
+from itertools import chain
 from pathlib import Path
 from datetime import datetime, timezone
+from typing import Any
 import sys
 
-def scan_snapshots(spa_assets_dir):
-    """Scan snapshots directory for asset information."""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Index count fields, the asset type each one tallies, and its label
+TOTAL_FIELDS = (
+    ("total_snapshots", "snapshot", "Snapshot"),
+    ("total_workbox_versions", "workbox", "Workbox version"),
+    ("total_vite_versions", "vite-chunks", "Vite version"),
+    ("total_diffs", "diff", "Diff"),
+)
+
+def load_json(path):
+    """Parse a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def dumps_indented(obj):
+    """Serialize obj to UTF-8 JSON bytes with 2-space indentation."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+# Fields copied from a snapshot's metadata.json into the index
+METADATA_FIELDS = ("endpoints_count", "modules_count", "protocol_version")
+
+if msgspec is not None:
+    class SnapshotMetadata(msgspec.Struct):
+        """The metadata.json fields the index keeps; other keys are skipped."""
+        
+        endpoints_count: Any = msgspec.UNSET
+        modules_count: Any = msgspec.UNSET
+        protocol_version: Any = msgspec.UNSET
+    
+    _metadata_decoder = msgspec.json.Decoder(SnapshotMetadata)
+
+def read_metadata_fields(path):
+    """Return the METADATA_FIELDS present in a snapshot's metadata.json.
+    
+    With msgspec installed only those fields are decoded and every other
+    value is skipped without being built.
+    """
+    if msgspec is not None:
+        with open(path, 'rb') as f:
+            metadata = _metadata_decoder.decode(f.read())
+        return {
+            field: getattr(metadata, field)
+            for field in METADATA_FIELDS
+            if getattr(metadata, field) is not msgspec.UNSET
+        }
+    
+    metadata = load_json(path)
+    return {
+        field: metadata[field]
+        for field in METADATA_FIELDS
+        if field in metadata
+    }
+
+class MetadataCache:
+    """Sidecar cache of metadata.json fields keyed by path, size and mtime.
+    
+    Lets unchanged snapshots be indexed from a readdir and a stat without
+    reparsing their metadata.json. Only entries used in the current run are
+    written back, so removed snapshots drop out of the cache.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.fresh = {}
+        try:
+            entries = load_json(path)
+        except (OSError, ValueError):
+            entries = None
+        self.entries = entries if isinstance(entries, dict) else {}
+    
+    def get(self, key, stat):
+        entry = self.entries.get(key)
+        if (
+            isinstance(entry, dict)
+            and isinstance(entry.get("fields"), dict)
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            self.fresh[key] = entry
+            return entry.get("fields")
+        return None
+    
+    def put(self, key, stat, fields):
+        self.fresh[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "fields": fields,
+        }
+    
+    def save(self):
+        if self.fresh == self.entries or not self.path.parent.is_dir():
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.fresh, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write {self.path}: {e}", file=sys.stderr)
+
+def _sorted_subdirs(path):
+    """Return the visible subdirectories of path as DirEntries sorted by name."""
+    with os.scandir(path) as it:
+        return sorted(
+            (entry for entry in it if not entry.name.startswith('.') and entry.is_dir()),
+            key=operator.attrgetter('name'),
+        )
+
+def _walk_sizes(root):
+    """Yield (relative_path, size) for every file under root.
+
+    Uses os.scandir with an explicit stack so each file costs a single
+    stat via the cached DirEntry, without building Path objects.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield os.path.relpath(entry.path, root), entry.stat().st_size
+
+def newest_mtime_ns(spa_assets_dir):
+    """Return the newest mtime of any file or directory an index scan reads.
+    
+    Directory mtimes cover added, removed and renamed entries; file mtimes
+    cover edits. spa-assets/ itself is included so that removing a whole
+    scanned tree counts; writing the index only touches metadata/, which is
+    skipped along with dot-entries.
+    """
+    newest = os.stat(spa_assets_dir).st_mtime_ns
+    with os.scandir(spa_assets_dir) as it:
+        stack = [
+            entry.path
+            for entry in it
+            if entry.is_dir(follow_symlinks=False)
+            and entry.name != "metadata"
+            and not entry.name.startswith('.')
+        ]
+    while stack:
+        path = stack.pop()
+        newest = max(newest, os.stat(path).st_mtime_ns)
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    newest = max(newest, entry.stat().st_mtime_ns)
+    return newest
+
+def scan_snapshots(spa_assets_dir, cache=None):
+    """Scan snapshots directory, yielding one asset per snapshot date."""
     snapshots_dir = spa_assets_dir / "snapshots"
-    assets = []
     
-    for date_dir in sorted(snapshots_dir.iterdir()):
-        if not date_dir.is_dir() or date_dir.name.startswith('.'):
-            continue
-        
+    for date_dir in _sorted_subdirs(snapshots_dir):
         files = {}
-        for file_path in date_dir.iterdir():
-            if file_path.is_file() and file_path.suffix == '.json':
-                file_info = {
-                    "size": file_path.stat().st_size
-                }
+        with os.scandir(date_dir) as it:
+            entries = list(it)
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1] == '.json':
+                fields = {}
                 
                 # Add specific metadata for known files
-                if file_path.name == "metadata.json":
-                    try:
-                        with open(file_path, 'r') as f:
-                            metadata = json.load(f)
-                            if "endpoints_count" in metadata:
-                                file_info["endpoints_count"] = metadata["endpoints_count"]
-                            if "modules_count" in metadata:
-                                file_info["modules_count"] = metadata["modules_count"]
-                            if "protocol_version" in metadata:
-                                file_info["protocol_version"] = metadata["protocol_version"]
-                    except Exception as e:
-                        print(f"Warning: Could not read {file_path}: {e}", file=sys.stderr)
+                if entry.name == "metadata.json":
+                    cache_key = f"snapshots/{date_dir.name}/{entry.name}"
+                    cached = cache.get(cache_key, entry.stat()) if cache is not None else None
+                    if cached is not None:
+                        fields = cached
+                    else:
+                        try:
+                            fields = read_metadata_fields(entry.path)
+                        except Exception as e:
+                            print(f"Warning: Could not read {entry.path}: {e}", file=sys.stderr)
+                        else:
+                            if cache is not None:
+                                cache.put(cache_key, entry.stat(), fields)
                 
-                files[file_path.name] = file_info
+                files[entry.name] = {"size": entry.stat().st_size, **fields}
         
         if files:
-            assets.append({
+            yield {
                 "type": "snapshot",
                 "date": date_dir.name,
                 "path": f"spa-assets/snapshots/{date_dir.name}/",
                 "files": files
-            })
-    
-    return assets
+            }
 
 def scan_workbox(spa_assets_dir):
-    """Scan workbox directory for version information."""
+    """Scan workbox directory, yielding one asset per version."""
     workbox_dir = spa_assets_dir / "workbox" / "versions"
-    assets = []
     
     if not workbox_dir.exists():
-        return assets
+        return
     
-    for version_dir in sorted(workbox_dir.iterdir()):
-        if not version_dir.is_dir() or version_dir.name.startswith('.'):
-            continue
-        
-        files = {}
-        for file_path in version_dir.rglob('*'):
-            if file_path.is_file():
-                rel_path = file_path.relative_to(version_dir)
-                files[str(rel_path)] = {
-                    "size": file_path.stat().st_size
-                }
+    for version_dir in _sorted_subdirs(workbox_dir):
+        files = {
+            rel_path: {"size": size}
+            for rel_path, size in _walk_sizes(version_dir.path)
+        }
         
         if files:
-            assets.append({
+            yield {
                 "type": "workbox",
                 "version": version_dir.name,
                 "path": f"spa-assets/workbox/versions/{version_dir.name}/",
                 "files": files
-            })
-    
-    return assets
+            }
 
 def scan_vite_chunks(spa_assets_dir):
-    """Scan vite-chunks directory for version information."""
+    """Scan vite-chunks directory, yielding one asset per version."""
     chunks_dir = spa_assets_dir / "vite-chunks" / "versions"
-    assets = []
     
     if not chunks_dir.exists():
-        return assets
+        return
     
-    for version_dir in sorted(chunks_dir.iterdir()):
-        if not version_dir.is_dir() or version_dir.name.startswith('.'):
-            continue
-        
-        files = {}
-        for file_path in version_dir.rglob('*'):
-            if file_path.is_file():
-                rel_path = file_path.relative_to(version_dir)
-                files[str(rel_path)] = {
-                    "size": file_path.stat().st_size
-                }
+    for version_dir in _sorted_subdirs(chunks_dir):
+        files = {
+            rel_path: {"size": size}
+            for rel_path, size in _walk_sizes(version_dir.path)
+        }
         
         if files:
-            assets.append({
+            yield {
                 "type": "vite-chunks",
                 "version": version_dir.name,
                 "path": f"spa-assets/vite-chunks/versions/{version_dir.name}/",
                 "files": files
-            })
-    
-    return assets
+            }
 
 def scan_diffs(spa_assets_dir):
-    """Scan diffs directory for difference reports."""
+    """Scan diffs directory, yielding one asset per difference report."""
     diffs_dir = spa_assets_dir / "diffs"
-    assets = []
     
-    for file_path in sorted(diffs_dir.glob('*.json')):
+    if not diffs_dir.exists():
+        return
+    
+    with os.scandir(diffs_dir) as it:
+        entries = sorted(
+            (entry for entry in it if entry.name.endswith('.json')),
+            key=operator.attrgetter('name'),
+        )
+    
+    for entry in entries:
         # Parse filename like "2026-01-20_to_2026-01-21.json"
-        parts = file_path.stem.split('_to_')
-        if len(parts) == 2:
-            assets.append({
+        before, sep, after = entry.name[:-len('.json')].partition('_to_')
+        if sep and '_to_' not in after:
+            yield {
                 "type": "diff",
-                "from": parts[0],
-                "to": parts[1],
-                "path": f"spa-assets/diffs/{file_path.name}",
-                "size": file_path.stat().st_size
-            })
+                "from": before,
+                "to": after,
+                "path": f"spa-assets/diffs/{entry.name}",
+                "size": entry.stat().st_size
+            }
+
+def iter_assets(spa_assets_dir, cache=None):
+    """Lazily chain every asset scanner."""
+    return chain(
+        scan_snapshots(spa_assets_dir, cache),
+        scan_workbox(spa_assets_dir),
+        scan_vite_chunks(spa_assets_dir),
+        scan_diffs(spa_assets_dir),
+    )
+
+def write_index(index_path, last_updated, assets):
+    """Stream assets into index_path one record at a time.
+
+    Output is laid out like json.dump(..., indent=2); the totals
+    follow the asset list because they are only known once it has been
+    written. Returns the number of assets written.
+    """
+    counts = Counter()
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    
+    with open(tmp_path, 'wb') as f:
+        f.write(f'{{\n  "last_updated": {json.dumps(last_updated)},\n  "assets": ['.encode())
+        separator = b"\n    "
+        for asset in assets:
+            counts[asset["type"]] += 1
+            f.write(separator)
+            f.write(dumps_indented(asset).replace(b"\n", b"\n    "))
+            separator = b",\n    "
+        tail = "\n  ]" if counts else "]"
+        for field, asset_type, _ in TOTAL_FIELDS:
+            tail += f',\n  "{field}": {counts[asset_type]}'
+        f.write((tail + "\n}").encode())
+    
+    os.replace(tmp_path, index_path)
+    return sum(counts.values())
+
+def compare_with_index(existing, assets):
+    """Compare scanned assets against an existing index in a single pass.
+    
+    Each asset is matched to its previous entry by path as it is scanned,
+    and the per-type counts are tallied in the same loop. Prints a warning
+    for every difference and returns True when there are none.
+    """
+    existing_assets = existing.get("assets", [])
+    previous_by_path = {asset.get("path"): asset for asset in existing_assets}
+    counts = Counter()
+    differences = []
+    in_order = True
+    
+    for position, asset in enumerate(assets):
+        counts[asset["type"]] += 1
+        previous = previous_by_path.pop(asset["path"], None)
+        if previous is None:
+            differences.append(f"  Added: {asset['path']}")
+        elif previous != asset:
+            differences.append(f"  Changed: {asset['path']}")
+        elif position >= len(existing_assets) or existing_assets[position] is not previous:
+            in_order = False
+    differences.extend(f"  Removed: {path}" for path in previous_by_path)
+    
+    ok = True
+    
+    for field, asset_type, label in TOTAL_FIELDS:
+        if existing.get(field) != counts[asset_type]:
+            print(f"Warning: {label} count mismatch: {existing.get(field)} vs {counts[asset_type]}")
+            ok = False
+    
+    total = sum(counts.values())
+    if len(existing_assets) != total:
+        print(f"Warning: Asset list length mismatch: {len(existing_assets)} vs {total}")
+        ok = False
+    
+    if "assets" in existing and (differences or not in_order):
+        print("Warning: Asset list contents differ from current scan")
+        for line in differences or ["  Assets are listed in a different order"]:
+            print(line)
+        ok = False
     
-    return assets
+    return ok
 
-def update_asset_index(repo_root, verify=False):
+def update_asset_index(repo_root, verify=False, fast=False):
     """Update the asset index file."""
     spa_assets_dir = repo_root / "spa-assets"
     
@@ -143,77 +379,40 @@ def update_asset_index(repo_root, verify=False):
         print("Error: spa-assets directory not found", file=sys.stderr)
         return False
     
-    # Scan all asset types
-    assets = []
-    assets.extend(scan_snapshots(spa_assets_dir))
-    assets.extend(scan_workbox(spa_assets_dir))
-    assets.extend(scan_vite_chunks(spa_assets_dir))
-    assets.extend(scan_diffs(spa_assets_dir))
-    
-    # Create index
-    index = {
-        "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "total_snapshots": sum(1 for a in assets if a["type"] == "snapshot"),
-        "total_workbox_versions": sum(1 for a in assets if a["type"] == "workbox"),
-        "total_vite_versions": sum(1 for a in assets if a["type"] == "vite-chunks"),
-        "total_diffs": sum(1 for a in assets if a["type"] == "diff"),
-        "assets": assets
-    }
-    
-    # Write or verify
     index_path = spa_assets_dir / "metadata" / "asset-index.json"
+    cache = MetadataCache(spa_assets_dir / "metadata" / ".asset-index-cache.json")
     
-    if verify:
-        if not index_path.exists():
-            print("Error: asset-index.json does not exist", file=sys.stderr)
-            return False
-        
-        with open(index_path, 'r') as f:
-            existing = json.load(f)
-        
-        # Compare all asset counts
-        ok = True
-
-        if existing.get("total_snapshots") != index["total_snapshots"]:
-            print(f"Warning: Snapshot count mismatch: {existing.get('total_snapshots')} vs {index['total_snapshots']}")
-            ok = False
-
-        if existing.get("total_workbox_versions") != index["total_workbox_versions"]:
-            print(f"Warning: Workbox version count mismatch: {existing.get('total_workbox_versions')} vs {index['total_workbox_versions']}")
-            ok = False
-
-        if existing.get("total_vite_versions") != index["total_vite_versions"]:
-            print(f"Warning: Vite version count mismatch: {existing.get('total_vite_versions')} vs {index['total_vite_versions']}")
-            ok = False
-
-        if existing.get("total_diffs") != index["total_diffs"]:
-            print(f"Warning: Diff count mismatch: {existing.get('total_diffs')} vs {index['total_diffs']}")
-            ok = False
-
-        existing_assets = existing.get("assets", [])
-        if len(existing_assets) != len(index["assets"]):
-            print(f"Warning: Asset list length mismatch: {len(existing_assets)} vs {len(index['assets'])}")
-            ok = False
-        elif "assets" in existing and existing_assets != index["assets"]:
-            print("Warning: Asset list contents differ from current scan")
-            ok = False
-
-        if not ok:
-            return False
-        
-        print("✓ Asset index is up to date")
+    if not verify:
+        last_updated = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        total = write_index(index_path, last_updated, iter_assets(spa_assets_dir, cache))
+        cache.save()
+        print(f"✓ Updated asset index: {total} assets cataloged")
         return True
-    else:
-        with open(index_path, 'w') as f:
-            json.dump(index, f, indent=2)
-        print(f"✓ Updated asset index: {len(assets)} assets cataloged")
+    
+    if fast and index_path.exists() and newest_mtime_ns(spa_assets_dir) <= index_path.stat().st_mtime_ns:
+        print("✓ Asset index is up to date (fast path)")
         return True
+    
+    if not index_path.exists():
+        print("Error: asset-index.json does not exist", file=sys.stderr)
+        return False
+    
+    existing = load_json(index_path)
+    ok = compare_with_index(existing, iter_assets(spa_assets_dir, cache))
+    cache.save()
+    
+    if not ok:
+        return False
+    
+    print("✓ Asset index is up to date")
+    return True
 
 def main():
     verify = '--verify' in sys.argv
+    fast = '--fast' in sys.argv
     repo_root = Path(__file__).parent.parent
     
-    success = update_asset_index(repo_root, verify=verify)
+    success = update_asset_index(repo_root, verify=verify, fast=fast)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Validation script for workspace setup."""
 
+import subprocess
 import sys
 from pathlib import Path
 
@@ -61,24 +62,35 @@ def check_python_imports() -> bool:
     """Check that Python packages can be imported."""
     print("\nChecking Python imports...")
 
-    # Add shared-python to path
-    sys.path.insert(0, str(Path("packages/shared-python/src")))
-
-    try:
-        from config import BaseSettings  # type: ignore
-
-        print("  ✓ shared-python.config")
-    except ImportError as e:
-        print(f"  ✗ shared-python.config: {e}")
-        return False
-
-    try:
-        from logger import get_logger  # type: ignore
-
-        print("  ✓ shared-python.logger")
-    except ImportError as e:
-        print(f"  ✗ shared-python.logger: {e}")
-        return False
+    # Each probe runs in a child interpreter so this process's sys.path is
+    # left alone; both start at once and are reported in order.
+    shared_src = str(Path("packages/shared-python/src").resolve())
+    probes = [
+        ("shared-python.config", "from config import BaseSettings"),
+        ("shared-python.logger", "from logger import get_logger"),
+    ]
+    procs = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                f"import sys; sys.path.insert(0, sys.argv[1]); {statement}",
+                shared_src,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        for _, statement in probes
+    ]
+    results = [proc.communicate()[1] for proc in procs]
+
+    for (name, _), proc, stderr in zip(probes, procs, results, strict=True):
+        if proc.returncode != 0:
+            lines = stderr.strip().splitlines()
+            print(f"  ✗ {name}: {lines[-1] if lines else f'exit code {proc.returncode}'}")
+            return False
+        print(f"  ✓ {name}")
 
     return True
 
@@ -2,7 +2,8 @@
 """
 Verify Integrity
 
-Verifies SHA-256 checksums of all tracked assets against integrity.json.
+Verifies SHA-256 (or BLAKE3) checksums of all tracked assets against
+integrity.json. BLAKE3 requires the optional `blake3` package.
 
 Usage:
     python scripts/verify_integrity.py [spa-assets/metadata/integrity.json]
@@ -10,21 +11,81 @@ Usage:
 
 import json
 import hashlib
+import mmap
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Files at least this large are hashed straight out of the page cache.
+MMAP_THRESHOLD = 1 << 20
+
+# Below this many bytes in total, process pool start-up (~70 ms) costs more
+# than hashing everything in-process at ~1 GB/s.
+PARALLEL_HASH_BYTES = 64 << 20
+
 def calculate_sha256(filepath):
     """Calculate SHA-256 hash of a file."""
-    sha256 = hashlib.sha256()
     try:
         with open(filepath, 'rb') as f:
-            for block in iter(lambda: f.read(4096), b''):
-                sha256.update(block)
-        return sha256.hexdigest()
+            # mmap rejects empty files, which the threshold also excludes
+            if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return hashlib.sha256(mm).hexdigest()
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    except Exception as e:
+        print(f"Error: Could not hash {filepath}: {e}", file=sys.stderr)
+        return None
+
+def calculate_blake3(filepath):
+    """Calculate BLAKE3 hash of a file."""
+    try:
+        hasher = blake3.blake3()
+        if os.stat(filepath).st_size >= MMAP_THRESHOLD:
+            hasher.update_mmap(str(filepath))
+        else:
+            with open(filepath, 'rb') as f:
+                hasher.update(f.read())
+        return hasher.hexdigest()
     except Exception as e:
         print(f"Error: Could not hash {filepath}: {e}", file=sys.stderr)
         return None
 
+HASHERS = {
+    'SHA-256': calculate_sha256,
+    'BLAKE3': calculate_blake3,
+}
+
+def hash_files(paths, hasher=calculate_sha256):
+    """Hash paths, yielding digests in input order.
+    
+    Large workloads are spread across a process pool; small ones are hashed
+    in-process.
+    """
+    total_bytes = 0
+    for path in paths:
+        try:
+            total_bytes += os.stat(path).st_size
+        except OSError:
+            pass
+    
+    if len(paths) < 2 or total_bytes < PARALLEL_HASH_BYTES:
+        yield from map(hasher, paths)
+        return
+    
+    with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+        yield from executor.map(hasher, paths, chunksize=8)
+
 def verify_integrity(integrity_file):
     """Verify all files listed in integrity.json."""
     repo_root = Path(__file__).parent.parent
@@ -33,36 +94,53 @@ def verify_integrity(integrity_file):
         print(f"Error: {integrity_file} not found", file=sys.stderr)
         return False
     
-    with open(integrity_file, 'r') as f:
-        integrity_data = json.load(f)
+    if orjson is not None:
+        integrity_data = orjson.loads(integrity_file.read_bytes())
+    else:
+        with open(integrity_file, 'r') as f:
+            integrity_data = json.load(f)
     
     files = integrity_data.get('files', {})
     algorithm = integrity_data.get('algorithm', 'SHA-256')
     
-    if algorithm != 'SHA-256':
+    if algorithm not in HASHERS:
         print(f"Error: Unsupported algorithm {algorithm}", file=sys.stderr)
         return False
     
+    if algorithm == 'BLAKE3' and blake3 is None:
+        print("Error: BLAKE3 checksums require the blake3 package (pip install blake3)", file=sys.stderr)
+        return False
+    
     print(f"Verifying {len(files)} files...")
     
     all_valid = True
     checked = 0
     skipped = 0
     
+    # Hash every present file up front in parallel; results come back in
+    # the same order so the report below reads exactly like a serial run.
+    found = {
+        filepath: (repo_root / filepath).exists()
+        for filepath, expected_hash in files.items()
+        if expected_hash != "pending"
+    }
+    hashes = hash_files(
+        [repo_root / filepath for filepath, exists in found.items() if exists],
+        HASHERS[algorithm],
+    )
+    
     for filepath, expected_hash in files.items():
-        full_path = repo_root / filepath
-        
         # Skip pending checksums
         if expected_hash == "pending":
             skipped += 1
             continue
         
-        if not full_path.exists():
+        if not found[filepath]:
             print(f"✗ {filepath}: File not found")
             all_valid = False
             continue
         
-        actual_hash = calculate_sha256(full_path)
+        actual_hash = next(hashes)
         if actual_hash is None:
             print(f"✗ {filepath}: Could not calculate hash")
             all_valid = False
@@ -76,6 +154,7 @@ def verify_integrity(integrity_file):
             print(f"  Expected: {expected_hash}")
             print(f"  Actual:   {actual_hash}")
             all_valid = False
+    hashes.close()
     
     print(f"\nSummary: {checked} verified, {skipped} skipped")
     
@@ -1,3 +1,14 @@
 """Auth service for Perplexity AI workspace."""
 
+import os
+import sys
+
 __version__ = "0.1.0"
+
+# Make packages/shared-python/src importable for the service modules; runs
+# once per process, before app.py or config.py are imported.
+_SHARED_SRC = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages", "shared-python", "src")
+)
+if _SHARED_SRC not in sys.path:
+    sys.path.insert(0, _SHARED_SRC)
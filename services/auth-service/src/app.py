@@ -1,12 +1,7 @@
 """FastAPI application for Auth service."""
 
-import sys
-from pathlib import Path
-
-# Add packages to path
-sys.path.insert(
-    0, str(Path(__file__).parent.parent.parent.parent / "packages" / "shared-python" / "src")
-)
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from logger import get_logger  # type: ignore
@@ -15,11 +10,21 @@ from .config import settings
 
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Log service startup and shutdown."""
+    logger.info(f"Auth service starting on {settings.host}:{settings.port}")
+    yield
+    logger.info("Auth service shutting down")
+
+
 app = FastAPI(
     title="Perplexity AI Auth Service",
     description="Authentication service with NextAuth flow",
     version="0.1.0",
     debug=settings.debug,
+    lifespan=lifespan,
 )
 
 
@@ -33,15 +38,3 @@ async def root() -> dict[str, str]:
 async def health() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy"}
-
-
-@app.on_event("startup")
-async def startup_event() -> None:
-    """Startup event handler."""
-    logger.info(f"Auth service starting on {settings.host}:{settings.port}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event() -> None:
-    """Shutdown event handler."""
-    logger.info("Auth service shutting down")
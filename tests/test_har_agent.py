@@ -0,0 +1,195 @@
+"""Tests for the HAR agent knowledge base."""
+
+import re
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root))
+
+import har_agent  # noqa: E402
+from har_agent import KnowledgeBase, Pattern, PatternMatcher  # noqa: E402
+
+LEARNED_PATTERNS = [
+    "/api/v1/users/{id}",
+    "/rest/thread/{uuid}",
+    "/api/v[0-9]+/search",
+    "/rest/(thread|entry)/list",
+    "ab?c/x",
+    "/a*/b",
+    "x{2}y",
+    "/api/[broken",
+    "/rest/thread",
+    "/api/v1/users/{id}",
+    "/api",
+]
+
+PATHS = [
+    "/api/v1/users/{id}",
+    "/api/v1/users/{id}/posts",
+    "/rest/thread/{uuid}",
+    "/rest/thread/list",
+    "/rest/entry/list",
+    "/v2/rest/entry/list",
+    "/api/v2/search",
+    "/api/vx/search",
+    "ac/x",
+    "abc/x",
+    "//b",
+    "/aaa/b",
+    "xxy",
+    "xy",
+    "/api/[broken",
+    "/other",
+    "",
+]
+
+
+@pytest.fixture(params=["ahocorasick", "fallback"])
+def matcher_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run a test with pyahocorasick when installed and with the substring fallback."""
+    if request.param == "ahocorasick":
+        if har_agent.ahocorasick is None:
+            pytest.skip("pyahocorasick not installed")
+    else:
+        monkeypatch.setattr(har_agent, "ahocorasick", None)
+    return str(request.param)
+
+
+@pytest.fixture
+def kb() -> KnowledgeBase:
+    """Create an in-memory knowledge base."""
+    return KnowledgeBase(":memory:")
+
+
+def _record_analysis(kb: KnowledgeBase, har_file: str) -> None:
+    with kb.write_transaction() as cursor:
+        cursor.execute(
+            "INSERT INTO analysis_history (har_file, analyzed_at, js_assets_count, "
+            "endpoints_found, new_patterns, quality_score) VALUES (?, '', 0, 0, 0, 1.0)",
+            (har_file,),
+        )
+
+
+def _count_analyses(kb: KnowledgeBase) -> int:
+    return int(kb.conn.execute("SELECT COUNT(*) FROM analysis_history").fetchone()[0])
+
+
+def test_stats_after_batch_rollback(kb: KnowledgeBase) -> None:
+    """Test that stats cached inside a failed batch are discarded."""
+    with pytest.raises(RuntimeError), kb.batch():
+        _record_analysis(kb, "h1")
+        assert kb.get_stats()["total_analyses"] == 1
+        raise RuntimeError("h2 failed")
+
+    assert _count_analyses(kb) == 0
+    assert kb.get_stats()["total_analyses"] == 0
+
+
+def test_batch_rollback_discards_queued_upserts(kb: KnowledgeBase) -> None:
+    """Test that upserts queued inside a failed batch are not flushed later."""
+    pattern = Pattern("/api/{id}", "Other", 0.9, "", "", 1, [])
+
+    with pytest.raises(RuntimeError), kb.batch():
+        kb.learn_pattern(pattern)
+        raise RuntimeError("h1 failed")
+
+    kb.flush()
+    assert kb.get_stats()["total_patterns"] == 0
+
+
+def test_failed_flush_drops_bad_rows(kb: KnowledgeBase) -> None:
+    """Test that a row that fails to upsert is raised once, not on every read."""
+    kb._pending_patterns.append(("bad",))
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        kb.flush()
+
+    assert kb.get_stats()["total_patterns"] == 0
+
+
+def test_close_after_failed_flush_closes_connection(kb: KnowledgeBase) -> None:
+    """Test that close() closes the connection even if the final flush fails."""
+    kb._pending_patterns.append(("bad",))
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        kb.close()
+
+    with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+        kb.conn.execute("SELECT 1")
+
+
+def test_stats_after_rollback_outside_batch(kb: KnowledgeBase) -> None:
+    """Test that a rolled back write transaction leaves no stale stats."""
+    _record_analysis(kb, "h1")
+    assert kb.get_stats()["total_analyses"] == 1
+
+    with pytest.raises(RuntimeError), kb.write_transaction() as cursor:
+        cursor.execute(
+            "INSERT INTO analysis_history (har_file, analyzed_at, js_assets_count, "
+            "endpoints_found, new_patterns, quality_score) VALUES ('h2', '', 0, 0, 0, 1.0)"
+        )
+        kb.get_stats()
+        raise RuntimeError("failed")
+
+    assert _count_analyses(kb) == 1
+    assert kb.get_stats()["total_analyses"] == 1
+
+
+def test_reads_wait_for_open_batch(kb: KnowledgeBase) -> None:
+    """Test that another thread cannot read a batch before it commits."""
+    seen: list[int] = []
+    reader = threading.Thread(target=lambda: seen.append(kb.get_stats()["total_analyses"]))
+
+    with kb.batch():
+        _record_analysis(kb, "h1")
+        reader.start()
+        reader.join(timeout=0.2)
+        assert reader.is_alive()
+
+    reader.join(timeout=5)
+    assert seen == [1]
+
+
+def test_nested_batch_keeps_outer_transaction(kb: KnowledgeBase) -> None:
+    """Test that a nested batch does not end the outer one early."""
+    with kb.batch():
+        with kb.batch():
+            _record_analysis(kb, "h1")
+        _record_analysis(kb, "h2")
+        assert kb.conn.in_transaction
+
+    assert not kb.conn.in_transaction
+    assert _count_analyses(kb) == 2
+
+
+def _linear_best_match(patterns: list[Pattern], path: str) -> Pattern | None:
+    for pattern in patterns:
+        try:
+            if re.search(pattern.pattern, path):
+                return pattern
+        except re.error:
+            continue
+    return None
+
+
+def test_pattern_matcher_matches_linear_scan(matcher_backend: str) -> None:
+    """Test that PatternMatcher picks the same pattern as a linear re.search scan."""
+    patterns = [Pattern(p, "Other", 0.9, "", "", 1, []) for p in LEARNED_PATTERNS]
+    matcher = PatternMatcher(patterns)
+
+    for path in PATHS:
+        assert matcher.best_match(path) is _linear_best_match(patterns, path), path
+
+
+def test_pattern_matcher_skips_invalid_regex(matcher_backend: str) -> None:
+    """Test that invalid regex patterns are dropped instead of raising."""
+    matcher = PatternMatcher([Pattern("/api/[broken", "Other", 0.9, "", "", 1, [])])
+
+    assert len(matcher) == 0
+    assert matcher.best_match("/api/[broken") is None